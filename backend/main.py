@@ -1,15 +1,28 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 import pandas as pd
 import numpy as np
 import joblib
-from typing import List, Dict, Optional
-import json
+from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
 import os
+import logging
 
-app = FastAPI()
+try:
+    # Optional: compiled forest for single-row inference (see requirements-advanced.txt)
+    import tl2cgen
+except ImportError:
+    tl2cgen = None
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Request-path logging; debug output is opt-in so /predict does no formatting or stdout I/O by default
+logger = logging.getLogger("predict")
+logger.setLevel(logging.INFO)
 
 # Allow CORS for frontend
 app.add_middleware(
@@ -23,8 +36,78 @@ app.add_middleware(
 # Model artifacts
 tree_model = None  # legacy fallback
 pipeline = None
+distilled_model = None  # single DecisionTreeRegressor fit on the forest's predictions (fast path)
+native_predictor = None  # tl2cgen.Predictor over model/rf.so, if compiled by train_model.py
+NATIVE_LIB_PATH = os.path.join("model", "rf.so")
 feature_names = []
 region_value_map = {}  # normalized-key -> actual category string from training
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "1000"))  # cap on /predict-batch records
+SUMMARY_BYTES: Optional[bytes] = None  # raw model/summary.json, served as-is by /model-info
+
+# Input-independent model metadata, computed once in load_model
+FEAT_NAMES: List[str] = []  # preprocessor output names (num__/cat__ prefixed)
+HUMAN_NAMES: List[str] = []  # display names aligned with FEAT_NAMES
+IMPORTANCES: Optional[np.ndarray] = None  # model.feature_importances_ as float64
+CAT_MASK: Optional[np.ndarray] = None  # True for OneHot output columns
+SORTED_IDX: Optional[np.ndarray] = None  # feature indices by descending importance
+MAX_IMP = 1.0  # legacy model's largest importance (1.0 if all are zero), used to normalize scores
+LEAF_VALUES: Optional[np.ndarray] = None  # node values of every tree, concatenated
+LEAF_OFFSETS: Optional[np.ndarray] = None  # start of each tree's nodes in LEAF_VALUES
+
+# Fitted OneHot/StandardScaler parameters for encoding a request without the ColumnTransformer
+REGION_INDEX: Optional[Dict[str, int]] = None  # training Region category -> output column
+NCAT = 0  # number of OneHot output columns (they come first)
+NUM_COLS: List[str] = []  # scaled numeric columns, in output order after the OneHot block
+NUM_MEAN: Optional[np.ndarray] = None
+NUM_SCALE: Optional[np.ndarray] = None
+
+# Columns the preprocessor was fitted on, in fit order (refreshed from the pipeline at startup)
+REQUIRED_COLS = [
+    "Region",
+    "Total Food Expenditure",
+    "Education Expenditure",
+    "house_floor_area",
+    "number_of_appliances",
+]
+
+
+def _std_region(s: str) -> str:
+    s = (s or "").strip().lower()
+    # Drop leading 'region ' if present
+    if s.startswith("region "):
+        s = s[len("region "):]
+    # unify iv-a / ivb forms
+    s = s.replace("iv-a", "iva").replace("iv-b", "ivb")
+    # known spelling mismatch in dataset
+    s = s.replace("zamboanga", "zasmboanga")
+    # collapse spaces
+    s = " ".join(s.split())
+    return s
+
+
+def _resolve_region(region: str) -> str:
+    """Map a region label to its training category."""
+    return region_value_map.get(_std_region(region), region)
+
+
+# Humanize feature names for display (precomputed into HUMAN_NAMES at startup)
+def _titleize_spaces(s: str) -> str:
+    s2 = s.replace("_", " ")
+    return " ".join(w.capitalize() if w else w for w in s2.split(" "))
+
+
+def _humanize(name: str) -> str:
+    if name.startswith("num__"):
+        base = name.replace("num__", "")
+        return _titleize_spaces(base)
+    if name.startswith("cat__"):
+        raw = name.replace("cat__", "")
+        # Convert OneHot "Region_Label" -> "Region: Label"
+        if "_" in raw:
+            head, tail = raw.split("_", 1)
+            return f"{_titleize_spaces(head)}: {tail}"
+        return _titleize_spaces(raw)
+    return _titleize_spaces(name)
 
 @app.get("/")
 def root():
@@ -37,11 +120,9 @@ def root():
 @app.get("/model-info")
 def model_info():
     """Return training summary and a tiny dataset preview for UI/docs."""
-    path = os.path.join("model", "summary.json")
-    if not os.path.exists(path):
+    if SUMMARY_BYTES is None:
         raise HTTPException(status_code=404, detail="summary.json not found. Retrain the model to generate it.")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return Response(content=SUMMARY_BYTES, media_type="application/json")
 
 class PredictRequest(BaseModel):
     region: str
@@ -57,32 +138,96 @@ class PredictResponse(BaseModel):
     feature_importances: Optional[List[float]] = None  # relative importances aligned with important_features
     prediction_std: Optional[float] = None  # per-instance std across trees (if available)
 
+class PredictBatchResponse(BaseModel):
+    predicted_income: List[float]  # aligned with the request list
+
 @app.on_event("startup")
 def load_model():
-    global pipeline, tree_model, feature_names, region_value_map
+    global pipeline, tree_model, feature_names, region_value_map, REQUIRED_COLS, native_predictor
+    global distilled_model
+    global FEAT_NAMES, HUMAN_NAMES, IMPORTANCES, CAT_MASK, SORTED_IDX, MAX_IMP
+    global REGION_INDEX, NCAT, NUM_COLS, NUM_MEAN, NUM_SCALE, SUMMARY_BYTES
+    global LEAF_VALUES, LEAF_OFFSETS
+    # Predictions memoized for a previous model are no longer valid
+    _predict_cached.cache_clear()
+    # Summary only changes on retrain; keep the file bytes for /model-info
+    try:
+        with open(os.path.join("model", "summary.json"), "rb") as f:
+            SUMMARY_BYTES = f.read()
+    except FileNotFoundError:
+        SUMMARY_BYTES = None
     try:
         pipeline = joblib.load("model/pipeline.joblib")
         feature_names = joblib.load("model/feature_names.joblib")
         print("Loaded pipeline for inference.")
+        # Distilled tree is optional; without it every request takes the exact forest path
+        try:
+            distilled_model = joblib.load("model/distilled.joblib")
+            print("Loaded distilled tree for fast inference.")
+        except Exception:
+            distilled_model = None
+        # Native forest is optional; the sklearn model stays the fallback
+        native_predictor = None
+        if tl2cgen is not None and os.path.exists(NATIVE_LIB_PATH):
+            try:
+                native_predictor = tl2cgen.Predictor(NATIVE_LIB_PATH, nthread=1)
+                print("Loaded compiled forest for inference.")
+            except Exception:
+                native_predictor = None
         # Build a normalization map for Region categories based on training values
         try:
             pre = pipeline.named_steps["preprocessor"]
             feat_names = list(pre.get_feature_names_out())
         except Exception:
             feat_names = feature_names or []
+        # Column order the ColumnTransformer expects at transform time
+        fitted_cols = getattr(pipeline.named_steps["preprocessor"], "feature_names_in_", None)
+        if fitted_cols is not None:
+            REQUIRED_COLS = [str(c) for c in fitted_cols]
+
+        # Cache names and importances used to explain each prediction
+        FEAT_NAMES = [str(n) for n in feat_names]
+        HUMAN_NAMES = [_humanize(n) for n in FEAT_NAMES]
+        # tree_.predict skips validation, so a distilled tree from an older pipeline must be rejected here
+        if distilled_model is not None and getattr(distilled_model, "n_features_in_", None) != len(FEAT_NAMES):
+            print("Distilled tree does not match the pipeline's features; ignoring it.")
+            distilled_model = None
+        importances = getattr(pipeline.named_steps["model"], "feature_importances_", None)
+        if importances is not None and len(importances) == len(FEAT_NAMES) and len(importances) > 0:
+            IMPORTANCES = np.asarray(importances, dtype=np.float64)
+            CAT_MASK = np.fromiter((n.startswith("cat__") for n in FEAT_NAMES), dtype=bool, count=len(FEAT_NAMES))
+            SORTED_IDX = np.argsort(-IMPORTANCES, kind="stable")
+        else:
+            IMPORTANCES = CAT_MASK = SORTED_IDX = None
 
-        def _std_region(s: str) -> str:
-            s = (s or "").strip().lower()
-            # Drop leading 'region ' if present
-            if s.startswith("region "):
-                s = s[len("region "):]
-            # unify iv-a / ivb forms
-            s = s.replace("iv-a", "iva").replace("iv-b", "ivb")
-            # known spelling mismatch in dataset
-            s = s.replace("zamboanga", "zasmboanga")
-            # collapse spaces
-            s = " ".join(s.split())
-            return s
+        # Flatten per-tree node values so per-tree predictions are one gather over the leaf indices
+        LEAF_VALUES = LEAF_OFFSETS = None
+        trees = getattr(pipeline.named_steps["model"], "estimators_", None)
+        if trees:
+            values = [t.tree_.value.reshape(-1) for t in trees]
+            LEAF_OFFSETS = np.cumsum([0] + [len(v) for v in values[:-1]])
+            LEAF_VALUES = np.concatenate(values).astype(np.float64)
+
+        # Extract encoder parameters; fall back to pre.transform if the layout is not the trained one
+        REGION_INDEX = None
+        try:
+            ohe = pre.named_transformers_["cat"]
+            sc = pre.named_transformers_["num"]
+            ncat = len(ohe.categories_[0])
+            num_cols = [str(c) for c in sc.feature_names_in_]
+            if (
+                list(ohe.feature_names_in_) == ["Region"]
+                and pre.output_indices_["cat"] == slice(0, ncat)
+                and pre.output_indices_["num"] == slice(ncat, ncat + len(num_cols))
+                and ncat + len(num_cols) == len(FEAT_NAMES)
+            ):
+                NCAT = ncat
+                NUM_COLS = num_cols
+                NUM_MEAN = np.zeros(len(num_cols)) if sc.mean_ is None else np.asarray(sc.mean_, dtype=np.float64)
+                NUM_SCALE = np.ones(len(num_cols)) if sc.scale_ is None else np.asarray(sc.scale_, dtype=np.float64)
+                REGION_INDEX = {c: i for i, c in enumerate(ohe.categories_[0])}
+        except Exception:
+            REGION_INDEX = None
 
         # Extract actual category strings from OHE names cat__Region_<value>
         region_values = []
@@ -104,156 +249,194 @@ def load_model():
             tree_model = joblib.load("model/random_forest_model.joblib")
             feature_names = joblib.load("model/feature_names.joblib")
             print("Loaded legacy model.")
+            importances = getattr(tree_model, "feature_importances_", None)
+            if importances is not None and len(importances) == len(feature_names) and len(importances) > 0:
+                IMPORTANCES = np.asarray(importances, dtype=np.float64)
+                SORTED_IDX = np.argsort(-IMPORTANCES, kind="stable")
+                MAX_IMP = float(IMPORTANCES[SORTED_IDX[0]]) or 1.0
+            else:
+                IMPORTANCES = SORTED_IDX = None
         except Exception as e:
             raise RuntimeError("No valid model artifacts found. Please run train_model.py.")
 
-@app.post("/predict", response_model=PredictResponse)
-def predict_income(data: PredictRequest):
-    try:
-        # Convert input to DataFrame and map UI keys to pipeline feature names
-        payload = data.dict()
-        # Accept both snake_case (from UI) and human-readable names (from tests/tools)
-        key_map = {
-            "region": "Region",
-            "total_food_expenditure": "Total Food Expenditure",
-            "education_expenditure": "Education Expenditure",
-            "house_floor_area": "house_floor_area",
-            "number_of_appliances": "number_of_appliances",
-            # Also allow already-correct keys to pass through
-            "Region": "Region",
-            "Total Food Expenditure": "Total Food Expenditure",
-            "Education Expenditure": "Education Expenditure",
-        }
-        model_input: Dict[str, object] = {}
-        for k, v in payload.items():
-            mapped = key_map.get(k, k)
-            # Region value normalization against training categories
-            if mapped == "Region":
-                def _std_region(s: str) -> str:
-                    s = (s or "").strip().lower()
-                    if s.startswith("region "):
-                        s = s[len("region "):]
-                    s = s.replace("iv-a", "iva").replace("iv-b", "ivb")
-                    s = s.replace("zamboanga", "zasmboanga")
-                    s = " ".join(s.split())
-                    return s
-                key = _std_region(str(v))
-                v_norm = region_value_map.get(key, v)
-                model_input[mapped] = v_norm
-            else:
-                model_input[mapped] = v
-        # Ensure required columns exist (friendly error)
-        required_cols = [
-            "Region",
-            "Total Food Expenditure",
-            "Education Expenditure",
-            "house_floor_area",
-            "number_of_appliances",
-        ]
-        missing = {c for c in required_cols if c not in model_input}
-        if missing:
-            raise ValueError(f"columns are missing: {missing}")
-
-        input_df = pd.DataFrame([model_input])
-        print("Received input_df:")
-        print(input_df)
-        if pipeline is not None:
-            # Prediction
-            pred = float(pipeline.predict(input_df)[0])
-
-            # Compute global feature importances mapped to names
-            top_k = 5
-            top_features = ["Region", "Total Food Expenditure", "Education Expenditure"]
-            top_scores: Optional[List[float]] = None
-            try:
-                model = pipeline.named_steps["model"]
-                pre = pipeline.named_steps["preprocessor"]
-                importances = getattr(model, "feature_importances_", None)
-                feat_names = []
-                try:
-                    feat_names = list(pre.get_feature_names_out())
-                except Exception:
-                    feat_names = feature_names or []
-                # Humanize feature names for display
-                def _titleize_spaces(s: str) -> str:
-                    s2 = s.replace("_", " ")
-                    return " ".join(w.capitalize() if w else w for w in s2.split(" "))
-
-                def _humanize(name: str) -> str:
-                    if name.startswith("num__"):
-                        base = name.replace("num__", "")
-                        return _titleize_spaces(base)
-                    if name.startswith("cat__"):
-                        raw = name.replace("cat__", "")
-                        # Convert OneHot "Region_Label" -> "Region: Label"
-                        if "_" in raw:
-                            head, tail = raw.split("_", 1)
-                            return f"{_titleize_spaces(head)}: {tail}"
-                        return _titleize_spaces(raw)
-                    return _titleize_spaces(name)
-
-                if importances is not None and len(importances) == len(feat_names) and len(importances) > 0:
-                    # Per-instance masking for OneHot categories: keep only active category columns
-                    try:
-                        Xtr = pre.transform(input_df)
-                    except Exception:
-                        Xtr = None
-
-                    adj_imps = np.array(importances, dtype=float).copy()
-                    if Xtr is not None:
-                        for i, fname in enumerate(feat_names):
-                            if fname.startswith("cat__") and float(Xtr[0, i]) == 0.0:
-                                adj_imps[i] = 0.0
-
-                    # Build list of (index, importance) with strictly positive importance after masking
-                    pairs = [(i, adj_imps[i]) for i in range(len(adj_imps)) if adj_imps[i] > 0]
-                    # Sort descending by importance
-                    pairs.sort(key=lambda t: t[1], reverse=True)
-                    # Take up to top_k
-                    sel = pairs[:top_k]
-                    if sel:
-                        idxs = [i for i, _ in sel]
-                        names_ordered_raw = [feat_names[i] for i in idxs]
-                        names_ordered = [_humanize(n) for n in names_ordered_raw]
-                        max_imp = float(max([v for _, v in sel]))
-                        scores = [float(adj_imps[i]) / max_imp if max_imp > 0 else 0.0 for i in idxs]
-                        top_features = names_ordered
-                        top_scores = scores
-            except Exception:
-                pass
+def _encode_row(model_input: Dict[str, object]) -> np.ndarray:
+    """Encode one request into the preprocessor's output layout as a (1, F) float32 row."""
+    if REGION_INDEX is None:
+        input_df = pd.DataFrame({c: [model_input[c]] for c in REQUIRED_COLS}, copy=False)
+        Xtr = pipeline.named_steps["preprocessor"].transform(input_df)
+        return np.ascontiguousarray(Xtr, dtype=np.float32)
+    # Scale in float64 like StandardScaler, then cast once as the trees do
+    row = np.zeros(NCAT + len(NUM_COLS), dtype=np.float64)
+    idx = REGION_INDEX.get(model_input["Region"])
+    if idx is not None:  # unknown regions encode as all zeros (handle_unknown="ignore")
+        row[idx] = 1.0
+    nums = np.array([model_input[c] for c in NUM_COLS], dtype=np.float64)
+    row[NCAT:] = (nums - NUM_MEAN) / NUM_SCALE
+    return row.astype(np.float32).reshape(1, -1)
+
+@lru_cache(maxsize=4096)
+def _predict_cached(
+    region: str, tfe: float, ee: float, hfa: float, noa: int, exact: bool = False
+) -> Tuple[float, Tuple[str, ...], Optional[Tuple[float, ...]], Optional[float]]:
+    """Predict and explain one household; memoized on the raw request values.
+
+    Unless ``exact`` is set, the distilled tree (or, without one, the compiled forest)
+    gives the point estimate and the per-tree std is skipped.
+    """
+    # Map request fields straight to pipeline columns
+    model_input: Dict[str, object] = {
+        "Region": region,
+        "Total Food Expenditure": tfe,
+        "Education Expenditure": ee,
+        "house_floor_area": hfa,
+        "number_of_appliances": noa,
+    }
+    # Region value normalization against training categories
+    model_input["Region"] = _resolve_region(str(model_input["Region"]))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("input=%r", model_input)
+    # Ensure required columns exist (friendly error)
+    missing = {c for c in REQUIRED_COLS if c not in model_input}
+    if missing:
+        raise ValueError(f"columns are missing: {missing}")
 
-            # Estimate prediction uncertainty via per-tree std if available (RandomForest)
-            pred_std = None
+    top_k = 5
+    if pipeline is not None:
+        # Encode once; the same matrix feeds the forest, the masking and the per-tree std
+        model = pipeline.named_steps["model"]
+        Xtr32 = _encode_row(model_input)
+        # Default path: distilled tree, else the compiled forest; neither gives a per-tree std
+        fast = not exact and (distilled_model is not None or native_predictor is not None)
+        # Per-tree predictions on the exact path: they give the std and, averaged, the forest's output
+        tree_preds = None
+        if LEAF_VALUES is not None and not fast:
             try:
-                # Transform once
-                Xtr = pipeline.named_steps["preprocessor"].transform(input_df)
-                trees = getattr(model, "estimators_", None)
-                if trees:
-                    tree_preds = np.array([est.predict(Xtr)[0] for est in trees])
-                    pred_std = float(np.std(tree_preds))
+                # Low-level Tree.apply skips sklearn's per-call validation and joblib dispatch
+                leaf_idx = np.fromiter(
+                    (est.tree_.apply(Xtr32)[0] for est in model.estimators_),
+                    dtype=np.intp,
+                    count=len(LEAF_OFFSETS),
+                )
+                tree_preds = LEAF_VALUES[LEAF_OFFSETS + leaf_idx]
             except Exception:
-                pred_std = None
+                tree_preds = None
+        if fast and distilled_model is not None:
+            pred = float(distilled_model.tree_.predict(Xtr32)[0, 0])
+        elif fast:
+            pred = float(np.ravel(native_predictor.predict(tl2cgen.DMatrix(Xtr32)))[0])
+        elif tree_preds is not None:
+            pred = float(tree_preds.mean())
         else:
-            # Legacy path
-            X = input_df[feature_names]
-            pred = float(tree_model.predict(X)[0])
-            importances = getattr(tree_model, "feature_importances_", None)
-            top_scores = None
-            if importances is not None and len(importances) == len(feature_names):
-                idx = np.argsort(importances)[::-1][:top_k]
-                top_features = [feature_names[i] for i in idx]
-                max_imp = float(importances[idx[0]]) if importances[idx[0]] != 0 else 1.0
-                top_scores = [float(importances[i]) / max_imp for i in idx]
-            else:
-                top_features = ["Region", "Total Food Expenditure", "Education Expenditure"]
-            pred_std = None
-
-        return PredictResponse(
-            predicted_income=pred,
-            important_features=top_features,
-            feature_importances=top_scores,
-            prediction_std=pred_std,
-        )
+            pred = float(model.predict(Xtr32)[0])
+
+        # Compute global feature importances mapped to names
+        top_features = ["Region", "Total Food Expenditure", "Education Expenditure"]
+        top_scores: Optional[List[float]] = None
+        try:
+            if IMPORTANCES is not None:
+                # Walk the precomputed ranking and keep the first top_k features with
+                # positive importance, skipping OneHot columns inactive for this instance
+                row = Xtr32[0]
+                idxs: List[int] = []
+                for i in SORTED_IDX:
+                    if IMPORTANCES[i] <= 0:
+                        break
+                    if CAT_MASK[i] and row[i] == 0.0:
+                        continue
+                    idxs.append(int(i))
+                    if len(idxs) == top_k:
+                        break
+                if idxs:
+                    names_ordered = [HUMAN_NAMES[i] for i in idxs]
+                    max_imp = float(IMPORTANCES[idxs[0]])
+                    scores = [float(IMPORTANCES[i]) / max_imp for i in idxs]
+                    top_features = names_ordered
+                    top_scores = scores
+        except Exception:
+            pass
+
+        # Estimate prediction uncertainty via per-tree std if available (RandomForest)
+        pred_std = float(tree_preds.std()) if tree_preds is not None else None
+    else:
+        # Legacy path
+        input_df = pd.DataFrame({c: [model_input[c]] for c in REQUIRED_COLS}, copy=False)
+        X = input_df[feature_names]
+        pred = float(tree_model.predict(X)[0])
+        top_scores = None
+        if SORTED_IDX is not None:
+            idx = SORTED_IDX[:top_k]
+            top_features = [feature_names[i] for i in idx]
+            top_scores = [float(IMPORTANCES[i]) / MAX_IMP for i in idx]
+        else:
+            top_features = ["Region", "Total Food Expenditure", "Education Expenditure"]
+        pred_std = None
+
+    return (
+        pred,
+        tuple(top_features),
+        tuple(top_scores) if top_scores is not None else None,
+        pred_std,
+    )
+
+def _run_inference(data: PredictRequest, exact: bool = False) -> PredictResponse:
+    """CPU-bound part of /predict: encode the request, predict and explain."""
+    pred, top_features, top_scores, pred_std = _predict_cached(
+        data.region,
+        data.total_food_expenditure,
+        data.education_expenditure,
+        data.house_floor_area,
+        data.number_of_appliances,
+        exact,
+    )
+    return PredictResponse(
+        predicted_income=pred,
+        important_features=list(top_features),
+        feature_importances=list(top_scores) if top_scores is not None else None,
+        prediction_std=pred_std,
+    )
+
+@app.post("/predict", response_model=PredictResponse)
+async def predict_income(data: PredictRequest, exact: bool = False):
+    """Predict household income; pass ?exact=true for the full forest and its per-tree std.
+
+    By default the distilled tree, or the compiled forest (model/rf.so) when there is no
+    distilled tree, gives the point estimate without a std.
+    """
+    try:
+        # Keep the event loop free while sklearn/numpy run in the worker pool
+        return await run_in_threadpool(_run_inference, data, exact)
+    except Exception as e:
+        logger.exception("predict failure")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/predict-batch", response_model=PredictBatchResponse)
+def predict_batch(items: List[PredictRequest]):
+    """Score up to MAX_BATCH_SIZE households in one pipeline pass (point estimates only).
+
+    Always uses the full forest (compiled model/rf.so when available), i.e. it matches
+    /predict?exact=true rather than the distilled default of /predict.
+    """
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} records per batch.")
+    try:
+        input_df = pd.DataFrame({
+            "Region": [_resolve_region(it.region) for it in items],
+            "Total Food Expenditure": [it.total_food_expenditure for it in items],
+            "Education Expenditure": [it.education_expenditure for it in items],
+            "house_floor_area": [it.house_floor_area for it in items],
+            "number_of_appliances": [it.number_of_appliances for it in items],
+        })
+        if input_df.empty:
+            return PredictBatchResponse(predicted_income=[])
+        if pipeline is not None and native_predictor is not None:
+            Xtr = pipeline.named_steps["preprocessor"].transform(input_df[REQUIRED_COLS])
+            Xtr32 = np.ascontiguousarray(Xtr, dtype=np.float32)
+            preds = np.ravel(native_predictor.predict(tl2cgen.DMatrix(Xtr32)))
+        elif pipeline is not None:
+            preds = pipeline.predict(input_df[REQUIRED_COLS])
+        else:
+            preds = tree_model.predict(input_df[feature_names])
+        return PredictBatchResponse(predicted_income=np.asarray(preds, dtype=np.float64).tolist())
     except Exception as e:
-        print("Exception in /predict:", e)
+        logger.exception("predict-batch failure")
         raise HTTPException(status_code=400, detail=str(e))
@@ -5,15 +5,31 @@ from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 import joblib
 import os
-import json
+import orjson
 from datetime import datetime
 
-# Load dataset
+# Load dataset: only the target, UI inputs and the columns the heuristics below derive from
 DATA_PATH = "Family-Income-and-Expenditure.csv"
-df = pd.read_csv(DATA_PATH)
+USE_COLS = ["Region", "Total Food Expenditure", "Education Expenditure", "Total Household Income"]
+
+
+def _wanted(c):
+    cl = c.lower()
+    return c in USE_COLS or ("floor" in cl and "area" in cl) or cl.startswith("number of ")
+
+
+header = pd.read_csv(DATA_PATH, nrows=0).columns
+try:
+    # Optional: multithreaded Arrow CSV parser (see requirements-advanced.txt)
+    import pyarrow  # noqa: F401
+    csv_engine = "pyarrow"
+except ImportError:
+    csv_engine = "c"
+df = pd.read_csv(DATA_PATH, engine=csv_engine, usecols=[c for c in header if _wanted(c)])
 
 # Minimal cleaning on key columns used by UI
 ui_cat = ["Region"]
@@ -62,18 +78,18 @@ target_col = "Total Household Income"
 keep_cols = [c for c in ui_cat + ui_num if c in df.columns] + [target_col]
 df_small = df[keep_cols].copy()
 
-# Handle missing values
-for col in df_small.columns:
-    if df_small[col].dtype == 'O':
-        df_small[col] = df_small[col].fillna("")
-    else:
-        df_small[col] = df_small[col].fillna(df_small[col].median())
+# Handle missing values: empty string for text columns, per-column median for the rest
+obj_cols = df_small.select_dtypes("object").columns
+num_cols = df_small.select_dtypes(exclude="object").columns
+df_small[obj_cols] = df_small[obj_cols].fillna("")
+df_small[num_cols] = df_small[num_cols].fillna(df_small[num_cols].median())
 
 # Define features actually used
 features_cat = [c for c in ui_cat if c in df_small.columns]
 features_num = [c for c in ui_num if c in df_small.columns]
 
-X = df_small[features_cat + features_num]
+# Numeric inputs as float32: the forest trains on float32 anyway, so this halves the copy it makes
+X = df_small[features_cat + features_num].astype({c: np.float32 for c in features_num})
 y = df_small[target_col]
 
 # Preprocessor and model pipeline
@@ -85,7 +101,15 @@ preprocessor = ColumnTransformer(
     remainder="drop",
 )
 
-model = RandomForestRegressor(n_estimators=40, max_depth=10, random_state=42, n_jobs=-1)
+# Bootstrap subsampling + leaf floor keep trees (and pipeline.joblib) small
+model = RandomForestRegressor(
+    n_estimators=40,
+    max_depth=10,
+    max_samples=0.3,
+    min_samples_leaf=20,
+    random_state=42,
+    n_jobs=-1,
+)
 pipeline = Pipeline(steps=[
     ("preprocessor", preprocessor),
     ("model", model)
@@ -95,18 +119,30 @@ X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_
 
 pipeline.fit(X_train, y_train)
 
-# Evaluate
-def print_metrics(pipe, X, y, name):
-    pred = pipe.predict(X)
+# Evaluate (predict the test split once and reuse it for every metric)
+def print_metrics(y, pred, name):
     print(f"{name} R2: {r2_score(y, pred):.3f}")
     print(f"{name} RMSE: {np.sqrt(mean_squared_error(y, pred)):.2f}")
     print(f"{name} MAE: {mean_absolute_error(y, pred):.2f}")
 
-print_metrics(pipeline, X_test, y_test, "RF Pipeline")
+y_pred_test = pipeline.predict(X_test)
+print_metrics(y_test, y_pred_test, "RF Pipeline")
 
 # Save pipeline and feature names after preprocessing
 os.makedirs("model", exist_ok=True)
-joblib.dump(pipeline, "model/pipeline.joblib")
+# Drop the previous distilled tree first so a failure below cannot pair it with the new pipeline
+if os.path.exists("model/distilled.joblib"):
+    os.remove("model/distilled.joblib")
+# Uncompressed: skips zlib work on dump and on every server start
+joblib.dump(pipeline, "model/pipeline.joblib", compress=0)
+
+# Distill the forest into a single tree for the fast /predict path
+pre_fitted = pipeline.named_steps["preprocessor"]
+y_soft = pipeline.predict(X_train)
+distilled = DecisionTreeRegressor(max_depth=12, random_state=42).fit(pre_fitted.transform(X_train), y_soft)
+y_pred_distilled = distilled.predict(pre_fitted.transform(X_test))
+print_metrics(y_test, y_pred_distilled, "Distilled tree")
+joblib.dump(distilled, "model/distilled.joblib", compress=0)
 
 # Derive feature names from ColumnTransformer
 feat_names = []
@@ -142,15 +178,31 @@ summary = {
         "params": {
             "n_estimators": pipeline.named_steps["model"].n_estimators,
             "max_depth": pipeline.named_steps["model"].max_depth,
+            "max_samples": pipeline.named_steps["model"].max_samples,
+            "min_samples_leaf": pipeline.named_steps["model"].min_samples_leaf,
             "random_state": pipeline.named_steps["model"].random_state,
         },
     },
     "metrics": {
-        "r2": float(r2_score(y_test, pipeline.predict(X_test))),
-        "rmse": float(np.sqrt(mean_squared_error(y_test, pipeline.predict(X_test)))),
-        "mae": float(mean_absolute_error(y_test, pipeline.predict(X_test))),
+        "r2": float(r2_score(y_test, y_pred_test)),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, y_pred_test))),
+        "mae": float(mean_absolute_error(y_test, y_pred_test)),
         "test_size": 0.3,
     },
+    # Default /predict path (the forest is used with ?exact=true)
+    "distilled_model": {
+        "type": "DecisionTreeRegressor",
+        "params": {
+            "max_depth": distilled.max_depth,
+            "random_state": distilled.random_state,
+        },
+        "metrics": {
+            "r2": float(r2_score(y_test, y_pred_distilled)),
+            "rmse": float(np.sqrt(mean_squared_error(y_test, y_pred_distilled))),
+            "mae": float(mean_absolute_error(y_test, y_pred_distilled)),
+            "test_size": 0.3,
+        },
+    },
     "training_time_utc": datetime.utcnow().isoformat() + "Z",
 }
 
@@ -174,7 +226,24 @@ except Exception:
 # Small preview of dataset (only used columns + target)
 preview_cols = [c for c in (features_cat + features_num + [target_col]) if c in df_small.columns]
 summary["preview_columns"] = preview_cols
-summary["preview_rows"] = df_small[preview_cols].head(5).to_dict(orient="records")
+# Rows as value lists aligned with preview_columns
+summary["preview_rows"] = df_small[preview_cols].head(5).to_numpy().tolist()
+
+with open("model/summary.json", "wb") as f:
+    f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
-with open("model/summary.json", "w", encoding="utf-8") as f:
-    json.dump(summary, f, ensure_ascii=False, indent=2)
+# Optional: compile the forest to a native library for fast single-row inference.
+# Requires treelite + tl2cgen (requirements-advanced.txt); main.py falls back to the sklearn model.
+native_lib = os.path.join("model", "rf.so")
+try:
+    import treelite
+    import tl2cgen
+
+    tl_model = treelite.sklearn.import_model(pipeline.named_steps["model"])
+    tl2cgen.export_lib(tl_model, toolchain="gcc", libpath=native_lib, params={"parallel_comp": 4})
+    print(f"Compiled forest to {native_lib}")
+except Exception as e:
+    # Never leave a library compiled from a previous model next to the new pipeline
+    if os.path.exists(native_lib):
+        os.remove(native_lib)
+    print("Skipping native forest compilation:", e)
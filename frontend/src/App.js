@@ -48,6 +48,9 @@ function App() {
         education_expenditure: parseFloat(form.education_expenditure) * 12,
         house_floor_area: parseFloat(form.house_floor_area),
         number_of_appliances: parseInt(form.number_of_appliances)
+      }, {
+        // Full forest: keeps predictions consistent and returns the uncertainty band
+        params: { exact: true }
       });
       setResult(res.data);
       // Seed the What-if panel with the submitted values
@@ -88,6 +91,9 @@ function App() {
         education_expenditure: parseFloat(whatIfForm.education_expenditure) * 12,
         house_floor_area: parseFloat(whatIfForm.house_floor_area),
         number_of_appliances: parseInt(whatIfForm.number_of_appliances)
+      }, {
+        // Full forest: keeps predictions consistent and returns the uncertainty band
+        params: { exact: true }
       });
       setWhatIfResult(res.data);
     } catch (err) {
@@ -382,8 +388,8 @@ function App() {
                         <tbody>
                           {modelInfo.preview_rows.map((row, i) => (
                             <tr key={i} className="odd:bg-white even:bg-blue-50/30">
-                              {modelInfo.preview_columns.map((c) => (
-                                <td key={c} className="px-2 py-1 border-b">{String(row[c])}</td>
+                              {modelInfo.preview_columns.map((c, j) => (
+                                <td key={c} className="px-2 py-1 border-b">{String(Array.isArray(row) ? row[j] : row[c])}</td>
                               ))}
                             </tr>
                           ))}